@@ -0,0 +1,49 @@
+import copy
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+TOKEN_CACHE_KEY = 'auth_token:{}'
+
+
+def get_token_cache_key(key):
+    return TOKEN_CACHE_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+
+def invalidate_tokens(*keys):
+    cache_keys = [get_token_cache_key(key) for key in keys]
+    cache.delete_many(cache_keys)
+    transaction.on_commit(lambda: cache.delete_many(cache_keys))
+
+
+def get_cacheable_token(token):
+    user = copy.copy(token.user)
+    del user.password
+    cacheable = copy.copy(token)
+    cacheable._state = copy.copy(token._state)
+    cacheable._state.fields_cache = {}
+    cacheable.user = user
+    return cacheable
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        cache_key = get_token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, get_cacheable_token(token),
+                      settings.AUTH_TOKEN_CACHE_TIMEOUT)
+            return user, token
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+
+        return token.user, token
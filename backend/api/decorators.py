@@ -0,0 +1,45 @@
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+RESPONSE_CACHE_KEY = 'response:{}'
+CONDITIONAL_HEADERS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',)
+CACHED_HEADERS = ('ETag',)
+
+
+def get_response_cache_key(view, request, *args, **kwargs):
+    parts = [request.path, *sorted(request.query_params.lists()),
+             *view.get_cached_versions(request, *args, **kwargs)]
+    return RESPONSE_CACHE_KEY.format(hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def cache_anonymous_response(timeout=None):
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.user.is_authenticated or any(
+                    header in request.META for header in CONDITIONAL_HEADERS):
+                return view_method(self, request, *args, **kwargs)
+
+            key = get_response_cache_key(self, request, *args, **kwargs)
+            cached = cache.get(key)
+            if cached is not None:
+                data, headers = cached
+                return Response(data, headers=headers)
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                headers = {header: response[header]
+                           for header in CACHED_HEADERS
+                           if response.has_header(header)}
+                cache.set(key, (response.data, headers), timeout)
+
+            return response
+
+        return wrapper
+
+    return decorator
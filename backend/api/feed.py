@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from recipes.models import Follow, Recipe
+from .tasks import task
+from .viewer import get_viewer_context
+
+FEED_KEY = 'feed:{}'
+HUGE_AUTHORS_KEY = 'feed_huge_authors'
+
+
+def get_huge_authors():
+    return cache.get(HUGE_AUTHORS_KEY, frozenset())
+
+
+def mark_huge_author(author_id):
+    cache.set(HUGE_AUTHORS_KEY, get_huge_authors() | {author_id}, None)
+
+
+def get_author_recipe_ids(author_ids):
+    return list(Recipe.objects.filter(author__in=author_ids).order_by(
+        '-pub_date', '-id').values_list('id', flat=True)[:settings.FEED_SIZE])
+
+
+def get_feed_ids(user, author_ids):
+    return cache.get_or_set(FEED_KEY.format(user.id),
+                            lambda: get_author_recipe_ids(author_ids),
+                            settings.FEED_TIMEOUT)
+
+
+def get_feed_queryset(request):
+    following = get_viewer_context(request).ids['following']
+    huge = following & get_huge_authors()
+    feed_ids = get_feed_ids(request.user, following - huge)
+
+    return Recipe.objects.filter(Q(id__in=feed_ids) | Q(author__in=huge))
+
+
+@task()
+def fan_out_recipe(recipe_id, author_id):
+    followers = list(Follow.objects.filter(author=author_id).values_list(
+        'user_id', flat=True)[:settings.FEED_FANOUT_LIMIT + 1])
+    if len(followers) > settings.FEED_FANOUT_LIMIT:
+        mark_huge_author(author_id)
+        return
+
+    feeds = cache.get_many([FEED_KEY.format(pk) for pk in followers])
+    cache.set_many({
+        key: [recipe_id, *feed_ids][:settings.FEED_SIZE]
+        for key, feed_ids in feeds.items()
+    }, settings.FEED_TIMEOUT)
+
+
+def invalidate_feed(user_id):
+    cache.delete(FEED_KEY.format(user_id))
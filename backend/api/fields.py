@@ -1,21 +1,66 @@
 import base64
+import binascii
 import uuid
+from tempfile import SpooledTemporaryFile
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from PIL import Image
 from rest_framework import serializers
 
 FILENAME_STR_OFFSET = 9
+BASE64_CHUNK_SIZE = 64 * 1024
 
 
 class Base64Field(serializers.ImageField):
+    default_error_messages = {
+        'too_large': 'Размер изображения не должен превышать {max_size} байт',
+        'too_big': 'Размер изображения не должен превышать '
+                   '{max_dimension}px по каждой стороне',
+    }
+
+    def decode(self, imgstr, name, content_type):
+        size = len(imgstr) * 3 // 4 - imgstr[-2:].count('=')
+        if size > settings.RECIPE_IMAGE_MAX_SIZE:
+            self.fail('too_large', max_size=settings.RECIPE_IMAGE_MAX_SIZE)
+
+        file = SpooledTemporaryFile(settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        try:
+            for start in range(0, len(imgstr), BASE64_CHUNK_SIZE):
+                file.write(base64.b64decode(
+                    imgstr[start:start + BASE64_CHUNK_SIZE], validate=True))
+        except (binascii.Error, ValueError):
+            file.close()
+            self.fail('invalid_image')
+        file.seek(0)
+
+        return InMemoryUploadedFile(file, None, name, content_type, size, None)
+
+    def check_dimensions(self, file):
+        try:
+            with Image.open(file) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            self.fail('too_big',
+                      max_dimension=settings.RECIPE_IMAGE_MAX_DIMENSION)
+        except OSError:
+            self.fail('invalid_image')
+        finally:
+            file.seek(0)
+        max_dimension = settings.RECIPE_IMAGE_MAX_DIMENSION
+        if width > max_dimension or height > max_dimension:
+            self.fail('too_big', max_dimension=max_dimension)
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
             img_format, imgstr = data.split(';base64,')
             ext = img_format.split('/')[-1]
             name = uuid.uuid4()
-            data = ContentFile(
-                base64.b64decode(imgstr),
-                name=name.urn[FILENAME_STR_OFFSET:] + '.' + ext
+            data = self.decode(
+                imgstr,
+                name.urn[FILENAME_STR_OFFSET:] + '.' + ext,
+                img_format[len('data:'):]
             )
+            self.check_dimensions(data)
 
         return super().to_internal_value(data)
@@ -1,32 +1,83 @@
 import django_filters as filters
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import FilterSet
-from rest_framework.filters import SearchFilter
+from rest_framework.filters import BaseFilterBackend
 
-from recipes.models import Recipe
+from recipes.models import Favorite, Purchase, Recipe, Tag
+from recipes.versions import get_versions
 
+TAG_CHOICES_KEY = 'tag_choices:{}'
 
-class IngredientFilter(SearchFilter):
+
+def get_tag_choices():
+    version, = get_versions('tags')
+    return cache.get_or_set(
+        TAG_CHOICES_KEY.format(version),
+        lambda: [(slug, slug) for slug in Tag.objects.order_by(
+            'slug').values_list('slug', flat=True)],
+        settings.TAG_CHOICES_TIMEOUT
+    )
+
+
+def filter_exists(queryset, name, subquery):
+    return queryset.annotate(**{name: Exists(subquery)}).filter(**{name: True})
+
+
+class IngredientFilter(BaseFilterBackend):
     search_param = 'name'
 
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query or view.action != 'list':
+            return queryset
+
+        return queryset.search(query, settings.INGREDIENT_SEARCH_LIMIT)
+
 
 class RecipeFilter(FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    search = filters.CharFilter(method='filter_search')
+    tags = filters.MultipleChoiceFilter(choices=get_tag_choices,
+                                        method='filter_tags')
     is_favorited = filters.NumberFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.NumberFilter(
         method='filter_is_in_shopping_cart'
     )
 
+    def filter_search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+
+        return queryset.search(value)
+
+    def filter_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+
+        return filter_exists(
+            queryset, 'has_tags', Recipe.tags.through.objects.filter(
+                recipe=OuterRef('pk'), tag__slug__in=value))
+
     def filter_is_favorited(self, queryset, name, value):
-        if value:
-            return queryset.filter(recipe__user=self.request.user)
+        if not value:
+            return queryset
+        if self.request.user.is_anonymous:
+            return queryset.none()
 
-        return queryset
+        return filter_exists(queryset, 'is_favorited', Favorite.objects.filter(
+            user=self.request.user, recipe=OuterRef('pk')))
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
-        if value:
-            return queryset.filter(purchase__user=self.request.user)
+        if not value:
+            return queryset
+        if self.request.user.is_anonymous:
+            return queryset.none()
 
-        return queryset
+        return filter_exists(
+            queryset, 'is_in_shopping_cart', Purchase.objects.filter(
+                user=self.request.user, recipe=OuterRef('pk')))
 
     class Meta:
         model = Recipe
@@ -0,0 +1,84 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+
+from recipes.models import RecipeQuerySet
+from recipes.versions import get_versions
+from .viewer import get_viewer_context
+
+RECIPE_FRAGMENT_KEY = 'recipe_fragment:{}:{}'
+
+
+def get_fragment_keys(recipes, request):
+    author_names = {f'author:{recipe.author_id}' for recipe in recipes}
+    names = ('tags', 'ingredients', *author_names)
+    versions = dict(zip(names, get_versions(*names)))
+    base = [request.build_absolute_uri('/') if request else '',
+            versions['tags'], versions['ingredients']]
+
+    keys = {}
+    for recipe in recipes:
+        parts = [*base, recipe.updated_at.timestamp(),
+                 versions[f'author:{recipe.author_id}']]
+        keys[recipe.id] = RECIPE_FRAGMENT_KEY.format(
+            recipe.id, hashlib.md5(
+                ':'.join(str(part) for part in parts).encode()).hexdigest())
+
+    return keys
+
+
+def serialize_fragments(serializer, recipes):
+    prefetch_related_objects(recipes, 'author',
+                             *RecipeQuerySet.related_lookups())
+    fragments = {}
+    for recipe in recipes:
+        data = serializer.to_representation(recipe)
+        del data['is_favorited'], data['is_in_shopping_cart']
+        if data['author'] is not None:
+            del data['author']['is_subscribed']
+        fragments[recipe.id] = data
+
+    return fragments
+
+
+def get_recipe_fragments(serializer, recipes, render):
+    keys = get_fragment_keys(recipes, serializer.context.get('request'))
+    cached = cache.get_many(keys.values())
+    fragments = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [recipe for recipe in recipes if recipe.id not in fragments]
+    if missing:
+        rendered = render(serializer, missing)
+        cache.set_many({keys[pk]: data for pk, data in rendered.items()},
+                       settings.RECIPE_FRAGMENT_TIMEOUT)
+        fragments.update(rendered)
+
+    return fragments
+
+
+def merge_viewer_flags(fragment, recipe, viewer):
+    data = dict(fragment)
+    data['is_favorited'] = viewer.is_favorited(recipe.id)
+    data['is_in_shopping_cart'] = viewer.is_in_shopping_cart(recipe.id)
+    if data['author'] is not None:
+        data['author'] = {**data['author'],
+                          'is_subscribed': viewer.is_subscribed(
+                              recipe.author_id)}
+
+    return data
+
+
+def render_recipes(serializer, recipes, render=serialize_fragments):
+    recipes = list(recipes)
+    if not recipes:
+        return []
+
+    fragments = get_recipe_fragments(serializer, recipes, render)
+    viewer = get_viewer_context(serializer.context.get('request'))
+    fields = serializer.Meta.fields
+    return [
+        {field: data[field] for field in fields}
+        for data in (merge_viewer_flags(fragments[recipe.id], recipe, viewer)
+                     for recipe in recipes)
+    ]
@@ -0,0 +1,193 @@
+import statistics
+import time
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from api.tasks import ImmediateBackend, get_backend
+from recipes.images import get_rendition_names
+from recipes.management.commands.seed_benchmark_data import USERNAME_PREFIX
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+IMAGE = ('data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJ'
+         'AAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg==')
+QUERY_BUDGETS = {
+    'recipe list': 8,
+    'recipe detail': 6,
+    'subscriptions': 5,
+    'ingredient search': 2,
+    'recipe search': 8,
+    'shopping list': 2,
+    'recipe create': 11,
+    'recipe update': 17,
+}
+
+
+class DeferredBackend(ImmediateBackend):
+
+    def __init__(self):
+        self.pending = []
+
+    def push(self, message):
+        self.pending.append(message)
+
+    def depth(self):
+        return len(self.pending)
+
+    def shutdown(self):
+        while self.pending:
+            self.process(self.pending.pop(0))
+
+
+class Command(BaseCommand):
+    help = ('Command measures latency, throughput and query counts of the '
+            'API hot paths on data from seed_benchmark_data and fails when '
+            'a query budget is exceeded. Example running this command: '
+            '"python manage.py benchmark --iterations 50"'
+            )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--no-budgets', action='store_true',
+                            help='only report, do not check query budgets')
+        parser.add_argument('--search', type=str, default='молоко',
+                            help='recipe search query')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(
+            username__startswith=USERNAME_PREFIX).annotate(
+            follows=Count('follower')).order_by('-follows', 'id').first()
+        if user is None:
+            raise CommandError('Run seed_benchmark_data first')
+
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.created = []
+        self.images = []
+        get_backend.cache_clear()
+        with override_settings(TASK_BACKEND=f'{__name__}.DeferredBackend'):
+            try:
+                results = [
+                    self.measure(name, options['iterations'], *scenario)
+                    for name, scenario in self.get_scenarios(
+                        user, options['search']).items()
+                ]
+                self.compare_search(options['search'],
+                                    options['iterations'])
+            finally:
+                self.cleanup()
+                get_backend.cache_clear()
+
+        exceeded = [
+            f'{name}: {max_queries} > {QUERY_BUDGETS[name]}'
+            for name, max_queries in results
+            if max_queries > QUERY_BUDGETS[name]
+        ]
+        if exceeded and not options['no_budgets']:
+            raise CommandError(
+                'Query budget exceeded: ' + ', '.join(exceeded))
+
+    def get_scenarios(self, user, search):
+        recipe = Recipe.objects.filter(author=user).first()
+        if recipe is None:
+            raise CommandError(f'{user.username} has no recipes to update')
+
+        ingredients = list(Ingredient.objects.values_list(
+            'id', flat=True)[:10])
+        tags = list(Tag.objects.values_list('id', flat=True)[:2])
+
+        def payload(method, amount):
+            return {
+                'name': f'Рецепт бенчмарка {method} {amount}',
+                'text': 'Текст', 'image': IMAGE,
+                'cooking_time': 15, 'tags': tags,
+                'ingredients': [{'id': pk, 'amount': amount + index}
+                                for index, pk in enumerate(ingredients)],
+            }
+
+        return {
+            'recipe list': ('get', '/api/recipes/?limit=20', None),
+            'recipe detail': ('get', f'/api/recipes/{recipe.id}/', None),
+            'subscriptions': (
+                'get', '/api/users/subscriptions/?recipes_limit=3', None),
+            'ingredient search': ('get', '/api/ingredients/?name=мол', None),
+            'recipe search': (
+                'get', f'/api/recipes/?search={search}&limit=20', None),
+            'shopping list': (
+                'get', '/api/recipes/download_shopping_cart/', None),
+            'recipe create': ('post', '/api/recipes/', payload),
+            'recipe update': ('patch', f'/api/recipes/{recipe.id}/', payload),
+        }
+
+    def request(self, method, url, data):
+        response = getattr(self.client, method)(url, data, format='json')
+        if response.status_code >= 400:
+            raise CommandError(
+                f'{method.upper()} {url} returned {response.status_code}')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        elif method == 'post':
+            self.created.append(response.data['id'])
+        if method in ('post', 'patch'):
+            self.images.append(unquote(urlparse(
+                response.data['image']).path)[len(settings.MEDIA_URL):])
+
+        return response
+
+    def measure(self, name, iterations, method, url, payload):
+        if payload:
+            self.request(method, url, payload(method, 1))
+            get_backend().shutdown()
+        timings, queries, task_queries = [], [], []
+        for iteration in range(iterations):
+            data = payload(method, iteration + 2) if payload else None
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                self.request(method, url, data)
+                timings.append(time.perf_counter() - started)
+            queries.append(len(context))
+            with CaptureQueriesContext(connection) as context:
+                get_backend().shutdown()
+            task_queries.append(len(context))
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'{name:<18} median {statistics.median(timings) * 1000:8.2f}ms '
+            f'p95 {p95 * 1000:8.2f}ms {iterations / sum(timings):8.1f} rps '
+            f'queries {min(queries)}-{max(queries)} '
+            f'(budget {QUERY_BUDGETS[name]}) '
+            f'tasks {min(task_queries)}-{max(task_queries)}')
+
+        return name, max(queries)
+
+    def compare_search(self, query, iterations):
+        for name, method in (('full-text', 'search'),
+                             ('icontains', 'search_icontains')):
+            timings = []
+            for iteration in range(iterations):
+                started = time.perf_counter()
+                queryset = getattr(Recipe.objects, method)(query)
+                count = queryset.count()
+                list(queryset.values_list('id', flat=True)[:20])
+                timings.append(time.perf_counter() - started)
+
+            self.stdout.write(
+                f'search {name:<11} median '
+                f'{statistics.median(timings) * 1000:8.2f}ms '
+                f'matches {count}')
+
+    def cleanup(self):
+        Recipe.objects.filter(pk__in=self.created).delete()
+        get_backend().shutdown()
+        for name in self.images:
+            for path in (name, *get_rendition_names(name).values()):
+                if default_storage.exists(path):
+                    default_storage.delete(path)
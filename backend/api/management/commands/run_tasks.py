@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.tasks import BrokerBackend, get_backend
+
+
+class Command(BaseCommand):
+    help = ('Command runs a worker processing tasks from the broker queue. '
+            'Requires TASK_BACKEND=api.tasks.BrokerBackend. '
+            'Example running this command: "python manage.py run_tasks"'
+            )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--timeout', type=int, default=5,
+                            help='Seconds to block waiting for a task')
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if not isinstance(backend, BrokerBackend):
+            raise CommandError('run_tasks requires the broker backend')
+
+        self.stdout.write('Waiting for tasks')
+        try:
+            while True:
+                message = backend.pop(options['timeout'])
+                if message is not None:
+                    backend.process(message)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Worker stopped'))
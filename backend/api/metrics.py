@@ -0,0 +1,92 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+METRICS = {
+    'request_duration_seconds': (
+        'Total time spent handling a request', DURATION_BUCKETS, 'view'),
+    'db_duration_seconds': (
+        'Time spent executing SQL queries', DURATION_BUCKETS, 'view'),
+    'db_queries': (
+        'Number of SQL queries per request', QUERY_BUCKETS, 'view'),
+    'serialization_duration_seconds': (
+        'Time spent building and rendering response data outside SQL',
+        DURATION_BUCKETS, 'view'),
+    'task_duration_seconds': (
+        'Time spent running a task', DURATION_BUCKETS, 'task'),
+    'task_latency_seconds': (
+        'Time from enqueueing a task until it finished', DURATION_BUCKETS,
+        'task'),
+}
+PREFIX = 'foodgram_'
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = defaultdict(dict)
+        self.gauges = {}
+
+    def observe(self, label, **values):
+        with self.lock:
+            for name, value in values.items():
+                histograms = self.histograms[name]
+                if label not in histograms:
+                    histograms[label] = Histogram(METRICS[name][1])
+                histograms[label].observe(value)
+
+    def gauge(self, name, description, func):
+        self.gauges[name] = (description, func)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, (description, _, label_name) in METRICS.items():
+                metric = PREFIX + name
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} histogram')
+                for label, histogram in sorted(
+                        self.histograms[name].items()):
+                    labels = f'{label_name}="{label}"'
+                    for bound, total in histogram.cumulative():
+                        lines.append(
+                            f'{metric}_bucket{{{labels},le="{bound}"}} '
+                            f'{total}')
+                    lines.append(f'{metric}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(
+                        f'{metric}_count{{{labels}}} {histogram.count}')
+
+        for name, (description, func) in self.gauges.items():
+            metric = PREFIX + name
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} gauge')
+            lines.append(f'{metric} {func()}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
@@ -0,0 +1,73 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class QueryTimer:
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.serialization_duration = 0
+        request.query_timer = queries = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, queries)
+
+        return response
+
+    def record(self, request, response, duration, queries):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        registry.observe(
+            view,
+            request_duration_seconds=duration,
+            db_duration_seconds=queries.duration,
+            db_queries=queries.count,
+            serialization_duration_seconds=request.serialization_duration,
+        )
+        if duration >= settings.SLOW_REQUEST_THRESHOLD:
+            logger.warning(
+                'Slow request %s %s (%s) %s: %.3fs, %d queries, db %.3fs, '
+                'serialization %.3fs', request.method, request.path, view,
+                response.status_code, duration, queries.count,
+                queries.duration, request.serialization_duration)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.view_started = (time.perf_counter(),
+                                request.query_timer.duration)
+
+    def process_template_response(self, request, response):
+        started, db_duration = request.view_started
+
+        def finish_rendering(rendered):
+            request.serialization_duration = (
+                time.perf_counter() - started
+                - (request.query_timer.duration - db_duration)
+            )
+
+        response.add_post_render_callback(finish_rendering)
+        return response
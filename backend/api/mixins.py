@@ -1,5 +1,10 @@
+import hashlib
+
+from django.views.decorators.http import condition
 from rest_framework import mixins, viewsets
 
+from recipes.versions import get_versions
+
 
 class CreateDestroyMixin(mixins.CreateModelMixin,
                          mixins.DestroyModelMixin,
@@ -11,3 +16,52 @@ class ListRetrieveMixin(mixins.ListModelMixin,
                         mixins.RetrieveModelMixin,
                         viewsets.GenericViewSet):
     pass
+
+
+class ReadSerializerMixin:
+    read_serializer_class = None
+    read_actions = ('list',)
+
+    def get_serializer_class(self):
+        if (self.action in self.read_actions and self.request.method == 'GET'
+                and self.read_serializer_class is not None):
+            return self.read_serializer_class
+
+        return super().get_serializer_class()
+
+
+class VersionedMixin:
+    version_names = ()
+    user_versioned = False
+
+    def get_version_names(self):
+        if self.user_versioned and self.request.user.is_authenticated:
+            return (*self.version_names, f'user:{self.request.user.id}')
+
+        return self.version_names
+
+
+class ConditionalGetMixin(VersionedMixin):
+
+    def get_versions(self, request, *args, **kwargs):
+        return get_versions(*self.get_version_names())
+
+    def get_cached_versions(self, request, *args, **kwargs):
+        if not hasattr(self, '_versions'):
+            self._versions = self.get_versions(request, *args, **kwargs)
+        return self._versions
+
+    def get_etag(self, request, *args, **kwargs):
+        parts = [request.get_full_path(), request.user.id,
+                 *self.get_cached_versions(request, *args, **kwargs)]
+        return hashlib.md5(
+            ':'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def conditional(self, view):
+        return condition(etag_func=self.get_etag)(view)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list)(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve)(request, *args, **kwargs)
@@ -1,5 +1,150 @@
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from recipes.versions import get_versions
+
+COUNT_KEY = 'count:{}'
+
+
+def get_estimated_count(queryset):
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < settings.PAGINATION_ESTIMATE_THRESHOLD:
+        return None
+    return int(row[0])
+
+
+def get_cached_count(queryset, version_names=()):
+    estimated = get_estimated_count(queryset)
+    if estimated is not None:
+        return estimated
+
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    signature = ':'.join(
+        str(part) for part in (sql, params, *get_versions(*version_names)))
+    key = COUNT_KEY.format(hashlib.md5(signature.encode()).hexdigest())
+
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_TIMEOUT)
+    return count
+
+
+class CachedCountPaginator(Paginator):
+
+    def __init__(self, *args, version_names=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version_names = version_names
+
+    @cached_property
+    def count(self):
+        return get_cached_count(self.object_list, self.version_names)
 
 
 class PageLimitPagination(pagination.PageNumberPagination):
     page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def django_paginator_class(self, queryset, page_size):
+        return CachedCountPaginator(queryset, page_size,
+                                    version_names=self.version_names)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.version_names = (view.get_version_names()
+                              if hasattr(view, 'get_version_names') else ())
+        self.keyset_ordering = getattr(view, 'keyset_ordering', None)
+        self.use_keyset = bool(self.keyset_ordering and (
+            self.cursor_query_param in request.query_params
+            or getattr(view, 'keyset_only', False)
+        ))
+        if not self.use_keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.keyset_ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.get_keyset_filter(
+                queryset.model, self.decode_cursor(cursor)))
+
+        page = list(queryset[:page_size + 1])
+        self.next_position = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_position = [getattr(page[-1], field.lstrip('-'))
+                                  for field in self.keyset_ordering]
+        return page
+
+    def get_keyset_filter(self, model, position):
+        keyset_filter = Q()
+        equal = {}
+        for field, value in zip(self.keyset_ordering, position):
+            name = field.lstrip('-')
+            try:
+                value = model._meta.get_field(name).to_python(value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            keyset_filter |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return keyset_filter
+
+    def encode_cursor(self, position):
+        data = json.dumps([str(value) for value in position])
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.keyset_ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if not self.use_keyset:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+
+        return replace_query_param(self.request.build_absolute_uri(),
+                                   self.cursor_query_param,
+                                   self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
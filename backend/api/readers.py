@@ -0,0 +1,141 @@
+from collections import defaultdict
+
+from django.core.files.storage import default_storage
+
+from recipes.catalog import IngredientCatalog
+from recipes.images import get_rendition_urls
+from recipes.models import IngredientAmount, Recipe
+from users.models import User
+from .fragments import render_recipes
+from .serializers import RecipeSerializer
+from .viewer import get_viewer_context
+
+
+def build_url(request, url):
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def build_image(request, name):
+    if not name:
+        return None
+
+    return build_url(request, default_storage.url(name))
+
+
+class ReadSerializer:
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @property
+    def request(self):
+        return self.context.get('request')
+
+    @property
+    def data(self):
+        if self.many:
+            return self.to_representation_many(self.instance)
+
+        return self.to_representation(self.instance)
+
+    def to_representation_many(self, instances):
+        return [self.to_representation(instance) for instance in instances]
+
+    def to_representation(self, instance):
+        raise NotImplementedError
+
+
+class IngredientReadSerializer(ReadSerializer):
+
+    def to_representation_many(self, instances):
+        if isinstance(instances, IngredientCatalog):
+            return [
+                {'id': pk, 'name': name, 'measurement_unit': unit}
+                for pk, name, unit in zip(
+                    instances.ids, instances.names, instances.units)
+            ]
+
+        return super().to_representation_many(instances)
+
+    def to_representation(self, instance):
+        return {'id': instance.id, 'name': instance.name,
+                'measurement_unit': instance.measurement_unit}
+
+
+class FollowReadSerializer(ReadSerializer):
+
+    def to_representation(self, instance):
+        author = instance.author
+        return {
+            'email': author.email,
+            'id': str(author.id),
+            'username': author.username,
+            'first_name': author.first_name,
+            'last_name': author.last_name,
+            'is_subscribed': (
+                instance.user_id == self.request.user.id
+                or get_viewer_context(self.request).is_subscribed(author.id)
+            ),
+            'recipes': [
+                {'id': recipe.id, 'name': recipe.name,
+                 'image': build_image(None, recipe.image.name),
+                 'cooking_time': recipe.cooking_time}
+                for recipe in instance.author_recipes
+            ],
+            'recipes_count': instance.recipes_count,
+        }
+
+
+def build_recipe_fragments(serializer, recipes):
+    request = serializer.request
+    ids = [recipe.id for recipe in recipes]
+    authors = {
+        author['id']: author
+        for author in User.objects.filter(
+            id__in={recipe.author_id for recipe in recipes}).values(
+            'email', 'id', 'username', 'first_name', 'last_name')
+    }
+    tags = defaultdict(list)
+    for recipe_id, *tag in Recipe.tags.through.objects.filter(
+            recipe__in=ids).values_list(
+            'recipe_id', 'tag__id', 'tag__name', 'tag__color', 'tag__slug'):
+        tags[recipe_id].append(dict(zip(('id', 'name', 'color', 'slug'), tag)))
+    ingredients = defaultdict(list)
+    for recipe_id, *amount in IngredientAmount.objects.filter(
+            recipe__in=ids).values_list(
+            'recipe_id', 'ingredient__id', 'ingredient__name',
+            'ingredient__measurement_unit', 'amount'):
+        ingredients[recipe_id].append(dict(zip(
+            ('id', 'name', 'measurement_unit', 'amount'), amount)))
+
+    return {
+        recipe.id: {
+            'id': recipe.id,
+            'tags': tags[recipe.id],
+            'author': authors.get(recipe.author_id),
+            'ingredients': ingredients[recipe.id],
+            'name': recipe.name,
+            'image': build_image(request, recipe.image.name),
+            'image_renditions': {
+                rendition: build_url(request, url)
+                for rendition, url in get_rendition_urls(recipe.image).items()
+            },
+            'text': recipe.text,
+            'cooking_time': recipe.cooking_time,
+        }
+        for recipe in recipes
+    }
+
+
+class RecipeReadSerializer(ReadSerializer):
+
+    class Meta:
+        fields = RecipeSerializer.Meta.fields
+
+    def to_representation_many(self, instances):
+        return render_recipes(self, instances, build_recipe_fragments)
+
+    def to_representation(self, instance):
+        return self.to_representation_many([instance])[0]
@@ -1,18 +1,27 @@
 import re
 
-from django.shortcuts import get_object_or_404
+from django.db import models, transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
 
+from recipes.images import get_rendition_urls
 from recipes.models import (
-    Favorite, Follow, Ingredient, IngredientAmount, Purchase, Recipe, Tag
+    Favorite, Follow, Ingredient, IngredientAmount, Recipe, RecipeQuerySet,
+    Tag
+)
+from recipes.purchases import (
+    get_amounts_delta, update_recipe_purchase_ingredients
 )
 from users.models import User
 from .fields import Base64Field
+from .fragments import render_recipes
+from .utils import generate_recipe_renditions
 from .validators import (
     validate_favorite_purchase, validate_ingredients, validate_subscribe,
     validate_tags
 )
+from .viewer import get_viewer_context
 
 
 class BaseUserSerializer(serializers.ModelSerializer):
@@ -20,10 +29,10 @@ class BaseUserSerializer(serializers.ModelSerializer):
 
     def get_is_subscribed(self, obj):
         request = self.context.get('request')
-        if not request or request.user.is_anonymous:
+        if not request:
             return False
 
-        return Follow.objects.filter(user=request.user, author=obj).exists()
+        return get_viewer_context(request).is_subscribed(obj.id)
 
     class Meta:
         model = User
@@ -112,22 +121,29 @@ class FollowSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
+        if obj.user_id == request.user.id:
+            return True
 
-        return Follow.objects.filter(user=request.user,
-                                     author=obj.author).exists()
+        return get_viewer_context(request).is_subscribed(obj.author_id)
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        recipe = Recipe.objects.filter(author=obj.author)
-        if limit:
-            recipe = recipe[:int(limit)]
+        if hasattr(obj, 'author_recipes'):
+            recipe = obj.author_recipes
+        else:
+            request = self.context.get('request')
+            limit = request.GET.get('recipes_limit')
+            recipe = Recipe.objects.filter(author=obj.author)
+            if limit:
+                recipe = recipe[:int(limit)]
 
         serializer = FollowRecipeSerializer(recipe, many=True)
 
         return serializer.data
 
     def get_recipes_count(self, obj):
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
+
         return Recipe.objects.filter(author=obj.author).count()
 
     class Meta:
@@ -154,6 +170,15 @@ class IngredientAmountSerializer(serializers.ModelSerializer):
         ]
 
 
+class RecipeListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+
+        return render_recipes(self.child, data)
+
+
 class RecipeSerializer(serializers.ModelSerializer):
     image = Base64Field()
     tags = TagSerializer(read_only=True, many=True)
@@ -165,57 +190,94 @@ class RecipeSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_renditions = serializers.SerializerMethodField()
 
-    def get_is_favorited(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
+    def to_representation(self, instance):
+        prefetch_related_objects([instance], 'author', 'tags',
+                                 *RecipeQuerySet.related_lookups())
+        return super().to_representation(instance)
 
-        return Favorite.objects.filter(user=user, recipe=obj).exists()
+    def get_image_renditions(self, obj):
+        request = self.context.get('request')
+        urls = get_rendition_urls(obj.image)
+        if request is None:
+            return urls
 
-    def get_is_in_shopping_cart(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
+        return {rendition: request.build_absolute_uri(url)
+                for rendition, url in urls.items()}
+
+    def get_is_favorited(self, obj):
+        viewer = get_viewer_context(self.context.get('request'))
+        return viewer.is_favorited(obj.id)
 
-        return Purchase.objects.filter(user=user, recipe=obj).exists()
+    def get_is_in_shopping_cart(self, obj):
+        viewer = get_viewer_context(self.context.get('request'))
+        return viewer.is_in_shopping_cart(obj.id)
 
     @staticmethod
     def __create_ingredient_amount(validated_ingredients, recipe):
         objs = [
             IngredientAmount(
                 recipe=recipe,
-                ingredient=get_object_or_404(
-                    Ingredient, id=ingredient_data.get('id')),
-                amount=ingredient_data.get('amount')
+                ingredient=ingredient_data['ingredient'],
+                amount=ingredient_data['amount']
             )
             for ingredient_data in validated_ingredients
         ]
         IngredientAmount.objects.bulk_create(objs)
 
-    @staticmethod
-    def __create_tags(data, recipe):
-        validated_tags = validate_tags(data.get('tags'))
-        tags = Tag.objects.filter(id__in=validated_tags)
+    @classmethod
+    def __update_ingredient_amount(cls, validated_ingredients, recipe):
+        existing = {
+            obj.ingredient_id: obj
+            for obj in IngredientAmount.objects.filter(recipe=recipe)
+        }
+        old_amounts = {pk: obj.amount for pk, obj in existing.items()}
+        new_amounts = {
+            ingredient_data['ingredient'].id: ingredient_data['amount']
+            for ingredient_data in validated_ingredients
+        }
+
+        removed = old_amounts.keys() - new_amounts.keys()
+        if removed:
+            IngredientAmount.objects.filter(
+                recipe=recipe, ingredient__in=removed).delete()
+
+        changed = [obj for pk, obj in existing.items()
+                   if pk in new_amounts and obj.amount != new_amounts[pk]]
+        for obj in changed:
+            obj.amount = new_amounts[obj.ingredient_id]
+        if changed:
+            IngredientAmount.objects.bulk_update(changed, ['amount'])
+
+        cls.__create_ingredient_amount(
+            [ingredient_data for ingredient_data in validated_ingredients
+             if ingredient_data['ingredient'].id not in existing],
+            recipe
+        )
 
-        recipe.tags.set(tags)
+        return get_amounts_delta(old_amounts, new_amounts)
 
+    @transaction.atomic
     def create(self, validated_data):
         validated_ingredients = validated_data.pop('ingredients')
+        validated_tags = validated_data.pop('tags')
 
         recipe = Recipe.objects.create(**validated_data)
-        self.__create_tags(self.initial_data, recipe)
+        recipe.tags.set(validated_tags)
         self.__create_ingredient_amount(validated_ingredients, recipe)
+        generate_recipe_renditions.delay(recipe.id, recipe.image.name)
 
         return recipe
 
     def validate(self, data):
-        ingredients = self.initial_data.get('ingredients')
-        validated_ingredients = validate_ingredients(ingredients)
-        data['ingredients'] = validated_ingredients
+        data['ingredients'] = validate_ingredients(
+            self.initial_data.get('ingredients'))
+        data['tags'] = validate_tags(self.initial_data.get('tags'))
 
         return data
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         instance.name = validated_data.get('name', instance.name)
         instance.image = validated_data.get('image', instance.image)
@@ -223,22 +285,26 @@ class RecipeSerializer(serializers.ModelSerializer):
         instance.cooking_time = validated_data.get(
             'cooking_time', instance.cooking_time)
 
-        instance.save()
-        instance.tags.remove()
+        instance.save(update_fields=('name', 'image', 'text', 'cooking_time',
+                                     'updated_at'))
+        instance.tags.set(validated_data['tags'])
+        if 'image' in validated_data:
+            generate_recipe_renditions.delay(instance.id, instance.image.name)
 
-        self.__create_tags(self.initial_data, instance)
-        instance.ingredientamount_set.filter(recipe__in=[instance.id]).delete()
-        valid_ingredients = validated_data.get(
-            'ingredients', instance.ingredients)
-        self.__create_ingredient_amount(valid_ingredients, instance)
+        update_recipe_purchase_ingredients(
+            instance.id,
+            self.__update_ingredient_amount(
+                validated_data['ingredients'], instance)
+        )
 
         return instance
 
     class Meta:
         model = Recipe
         fields = ('id', 'tags', 'author', 'ingredients', 'is_favorited',
-                  'is_in_shopping_cart', 'name', 'image', 'text',
-                  'cooking_time',)
+                  'is_in_shopping_cart', 'name', 'image', 'image_renditions',
+                  'text', 'cooking_time',)
+        list_serializer_class = RecipeListSerializer
 
 
 class RecipeGetSerializer(serializers.ModelSerializer):
@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Favorite, Follow, Ingredient, Purchase, Recipe, Tag
+from recipes.purchases import (
+    bump_shopping_cart_version, get_recipe_amounts, update_purchase_ingredients
+)
+from recipes.search import remove_from_search_index
+from recipes.versions import bump_versions
+from users.models import User
+from .authentication import invalidate_tokens
+from .feed import invalidate_feed
+from .utils import update_recipe_counter, update_recipe_search
+
+
+@receiver([post_save, post_delete], sender=Purchase)
+def purchase_changed(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: bump_shopping_cart_version(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    transaction.on_commit(lambda: bump_versions('ingredients'))
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_changed(sender, **kwargs):
+    transaction.on_commit(lambda: bump_versions('recipes'))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    update_recipe_search.delay(instance.id)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    remove_from_search_index([instance.id])
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def tag_changed(sender, **kwargs):
+    transaction.on_commit(lambda: bump_versions('tags'))
+
+
+@receiver([post_save, post_delete], sender=Favorite)
+@receiver([post_save, post_delete], sender=Purchase)
+@receiver([post_save, post_delete], sender=Follow)
+def user_relation_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_versions(f'user:{instance.user_id}'))
+
+
+@receiver(post_save, sender=Favorite)
+def favorite_created(sender, instance, created, **kwargs):
+    if created:
+        update_recipe_counter.delay(instance.recipe_id, 'favorites_count', 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def favorite_deleted(sender, instance, **kwargs):
+    update_recipe_counter.delay(instance.recipe_id, 'favorites_count', -1)
+
+
+@receiver(post_save, sender=Purchase)
+def purchase_created(sender, instance, created, **kwargs):
+    if created:
+        update_recipe_counter.delay(instance.recipe_id, 'cart_count', 1)
+        update_purchase_ingredients(
+            [instance.user_id], get_recipe_amounts(instance.recipe_id))
+
+
+@receiver(pre_delete, sender=Purchase)
+def purchase_deleting(sender, instance, **kwargs):
+    update_purchase_ingredients(
+        [instance.user_id], get_recipe_amounts(instance.recipe_id, -1))
+
+
+@receiver(post_delete, sender=Purchase)
+def purchase_deleted(sender, instance, **kwargs):
+    update_recipe_counter.delay(instance.recipe_id, 'cart_count', -1)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    invalidate_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, update_fields, **kwargs):
+    if created or update_fields == frozenset(('last_login',)):
+        return
+
+    invalidate_tokens(*Token.objects.filter(
+        user=instance).values_list('key', flat=True))
+    transaction.on_commit(
+        lambda: bump_versions(f'author:{instance.id}', 'recipes'))
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_feed(instance.user_id))
@@ -0,0 +1,160 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+
+    def __init__(self, func, max_retries, retry_delay):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__name__}'
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        message = {'name': self.name, 'args': args, 'kwargs': kwargs,
+                   'attempt': 0}
+        transaction.on_commit(lambda: get_backend().enqueue(message))
+
+
+def task(max_retries=None, retry_delay=None):
+    def decorator(func):
+        return Task(
+            func,
+            settings.TASK_MAX_RETRIES if max_retries is None else max_retries,
+            settings.TASK_RETRY_DELAY if retry_delay is None else retry_delay,
+        )
+
+    return decorator
+
+
+class BaseBackend:
+
+    def enqueue(self, message):
+        self.push({**message, 'enqueued_at': time.time()})
+
+    def push(self, message):
+        raise NotImplementedError
+
+    def depth(self):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+    def retry(self, message, delay):
+        time.sleep(delay)
+        self.push(message)
+
+    def close_connections(self):
+        close_old_connections()
+
+    def process(self, message):
+        task = import_string(message['name'])
+        started = time.time()
+        self.close_connections()
+        try:
+            task(*message['args'], **message['kwargs'])
+        except Exception:
+            if message['attempt'] >= task.max_retries:
+                logger.exception('Task %s failed after %d attempts',
+                                 task.name, message['attempt'] + 1)
+                return
+            logger.warning('Task %s failed, retrying', task.name,
+                           exc_info=True)
+            self.retry({**message, 'attempt': message['attempt'] + 1},
+                       task.retry_delay)
+        else:
+            registry.observe(
+                task.name,
+                task_duration_seconds=time.time() - started,
+                task_latency_seconds=time.time() - message['enqueued_at'],
+            )
+        finally:
+            self.close_connections()
+
+
+class ImmediateBackend(BaseBackend):
+
+    def push(self, message):
+        self.process(message)
+
+    def retry(self, message, delay):
+        self.push(message)
+
+    def close_connections(self):
+        pass
+
+    def depth(self):
+        return 0
+
+
+class ThreadPoolBackend(BaseBackend):
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.TASK_WORKERS, thread_name_prefix='tasks')
+        self.lock = threading.Lock()
+        self.pending = 0
+
+    def push(self, message):
+        with self.lock:
+            self.pending += 1
+        self.executor.submit(self.run, message)
+
+    def run(self, message):
+        with self.lock:
+            self.pending -= 1
+        self.process(message)
+
+    def retry(self, message, delay):
+        timer = threading.Timer(delay, self.push, (message,))
+        timer.daemon = True
+        timer.start()
+
+    def depth(self):
+        return self.pending
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+class BrokerBackend(BaseBackend):
+
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        self.connection = get_redis_connection(settings.TASK_BROKER_CACHE)
+
+    def push(self, message):
+        self.connection.lpush(settings.TASK_QUEUE, json.dumps(message))
+
+    def pop(self, timeout):
+        item = self.connection.brpop(settings.TASK_QUEUE, timeout)
+        return json.loads(item[1]) if item else None
+
+    def depth(self):
+        return self.connection.llen(settings.TASK_QUEUE)
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.TASK_BACKEND)()
+
+
+registry.gauge('task_queue_depth', 'Tasks waiting to be run',
+               lambda: get_backend().depth())
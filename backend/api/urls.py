@@ -4,7 +4,7 @@ from rest_framework import routers
 
 from .views import (
     FavoriteViewSet, FollowViewSet, IngredientViewSet, PurchaseViewSet,
-    RecipeViewSet, TagViewSet, UserListCreateViewSet
+    RecipeViewSet, TagViewSet, UserListCreateViewSet, metrics
 )
 
 app_name = 'api'
@@ -32,6 +32,7 @@ urlpatterns = [
     path('recipes/download_shopping_cart/',
          PurchaseViewSet.as_view({'get': 'purchase_list'}),
          name='purchase_list'),
+    path('metrics/', metrics, name='metrics'),
     path('', include(router.urls)),
     path('auth/', include('djoser.urls.authtoken')),
 ]
@@ -1,20 +1,115 @@
-from django.db.models import Sum
+import csv
 
-from recipes.models import IngredientAmount
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from recipes.images import generate_renditions
+from recipes.models import PurchaseIngredient, Recipe
+from recipes.purchases import get_shopping_cart_version
+from recipes.search import update_search_index
+from recipes.versions import bump_versions
+from .tasks import task
+
+SHOPPING_CART_KEY = 'shopping_cart:{}:{}'
+
+
+@task()
+def generate_recipe_renditions(recipe_id, name):
+    generate_renditions(name)
+    Recipe.objects.filter(pk=recipe_id).update(updated_at=timezone.now())
+    bump_versions('recipes')
+
+
+@task(max_retries=0)
+def update_recipe_counter(recipe_id, field, delta):
+    Recipe.objects.filter(pk=recipe_id).update(**{field: F(field) + delta})
+    bump_versions('popularity')
+
+
+@task()
+def update_recipe_search(recipe_id):
+    update_search_index([recipe_id])
+    bump_versions('recipes')
 
 
 def get_ingredients_list_for_shopping(user):
-    purchase_list = []
-    ingredients = IngredientAmount.objects.filter(
-        recipe__purchase__user=user).values(
-        'ingredient__name', 'ingredient__measurement_unit').order_by(
-        'ingredient__name').annotate(total=Sum('amount'))
-
-    for ingredient in ingredients:
-        purchase_list.append(
-            f'{ingredient["ingredient__name"]} - '
-            f'{ingredient["total"]} '
-            f'{ingredient["ingredient__measurement_unit"]}\n'
-        )
-
-    return purchase_list
+    key = SHOPPING_CART_KEY.format(user.id,
+                                   get_shopping_cart_version(user.id))
+    rows = cache.get(key)
+    if rows is not None:
+        yield from rows
+        return
+
+    rows = []
+    ingredients = PurchaseIngredient.objects.filter(user=user).order_by(
+        'ingredient__name').values_list(
+        'ingredient__name', 'ingredient__measurement_unit', 'total')
+    for row in ingredients.iterator():
+        rows.append(row)
+        yield row
+
+    cache.set(key, rows, settings.SHOPPING_CART_CACHE_TIMEOUT)
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def render_shopping_list_txt(ingredients):
+    for name, measurement_unit, total in ingredients:
+        yield f'{name} - {total} {measurement_unit}\n'
+
+
+def render_shopping_list_csv(ingredients):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'measurement_unit', 'amount'))
+    for name, measurement_unit, total in ingredients:
+        yield writer.writerow((name, measurement_unit, total))
+
+
+SHOPPING_LIST_FORMATS = {
+    'txt': ('text/plain; charset=utf-8', render_shopping_list_txt),
+    'csv': ('text/csv; charset=utf-8', render_shopping_list_csv),
+}
+
+
+def get_recipes_by_authors(author_ids, limit=None):
+    recipes = Recipe.objects.filter(author__in=author_ids).only(
+        'id', 'author', 'name', 'image', 'cooking_time', 'pub_date')
+    if not limit or not author_ids:
+        return recipes
+
+    recipes = recipes.order_by().annotate(row_number=Window(
+        expression=RowNumber(),
+        partition_by=[F('author')],
+        order_by=F('pub_date').desc(),
+    ))
+    sql, params = recipes.query.sql_with_params()
+
+    return Recipe.objects.raw(
+        f'SELECT * FROM ({sql}) ranked WHERE ranked.row_number <= %s '
+        f'ORDER BY ranked.author_id, ranked.row_number',
+        params + (limit,)
+    )
+
+
+def load_subscriptions(follows, recipes_limit=None):
+    author_ids = [follow.author_id for follow in follows]
+    counts = dict(
+        Recipe.objects.filter(author__in=author_ids).order_by().values(
+            'author').annotate(count=Count('id')).values_list(
+            'author', 'count')
+    )
+    recipes = {author_id: [] for author_id in author_ids}
+    for recipe in get_recipes_by_authors(author_ids, recipes_limit):
+        recipes[recipe.author_id].append(recipe)
+
+    for follow in follows:
+        follow.recipes_count = counts.get(follow.author_id, 0)
+        follow.author_recipes = recipes[follow.author_id]
+
+    return follows
@@ -1,38 +1,77 @@
 from rest_framework.validators import ValidationError
 
-from recipes.models import Ingredient, Tag
+from recipes.catalog import get_ingredient_catalog
+from recipes.models import Tag
+
+
+def format_ids(ids):
+    return ', '.join(str(pk) for pk in ids)
+
+
+def parse_amount(value):
+    try:
+        amount = int(value)
+    except (TypeError, ValueError):
+        return None
+    return amount if amount >= 1 else None
 
 
 def validate_ingredients(ingredients):
     if not ingredients or len(ingredients) < 1:
         raise ValidationError({'ingredients': ['Обязательное поле']})
 
-    ingredients_ids = []
+    catalog = get_ingredient_catalog()
+    resolved = {}
+    missing, duplicates, invalid_amounts = [], [], []
     for ingredient in ingredients:
         pk = ingredient.get('id')
-        if not pk or not Ingredient.objects.filter(id=pk).exists():
-            raise ValidationError({'ingredients': ['Ингредиент не найден']})
-
-        if pk in ingredients_ids:
-            raise ValidationError(
-                {'ingredients': ['Ингредиент с таким id уже передан']})
-        ingredients_ids.append(pk)
-
-        if int(ingredient.get('amount')) < 1:
-            raise ValidationError({'amount': ['Минимальное количество - 1']})
-
-    return ingredients
+        obj = catalog.get(pk)
+        if obj is None:
+            missing.append(pk)
+        elif obj.id in resolved:
+            duplicates.append(obj.id)
+        else:
+            resolved[obj.id] = {
+                'ingredient': obj,
+                'amount': parse_amount(ingredient.get('amount')),
+            }
+            if resolved[obj.id]['amount'] is None:
+                invalid_amounts.append(obj.id)
+
+    errors = {}
+    if missing:
+        errors['ingredients'] = [
+            f'Ингредиент не найден: {format_ids(missing)}']
+    if duplicates:
+        errors.setdefault('ingredients', []).append(
+            f'Ингредиент с таким id уже передан: {format_ids(duplicates)}')
+    if invalid_amounts:
+        errors['amount'] = [
+            f'Минимальное количество - 1: {format_ids(invalid_amounts)}']
+    if errors:
+        raise ValidationError(errors)
+
+    return list(resolved.values())
 
 
 def validate_tags(tags):
     if not tags or len(tags) < 1:
         raise ValidationError({'tags': ['Обязательное поле']})
 
-    for tag in tags:
-        if not Tag.objects.filter(id=tag).exists():
-            raise ValidationError({'tags': ['Тэг не найден']})
+    ids, missing = [], []
+    for pk in tags:
+        try:
+            ids.append(int(pk))
+        except (TypeError, ValueError):
+            missing.append(pk)
+
+    resolved = Tag.objects.in_bulk(ids)
+    missing.extend(pk for pk in ids if pk not in resolved)
+    if missing:
+        raise ValidationError(
+            {'tags': [f'Тэг не найден: {format_ids(missing)}']})
 
-    return tags
+    return list({pk: resolved[pk] for pk in ids}.values())
 
 
 def validate_subscribe(context):
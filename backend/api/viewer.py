@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from recipes.models import Favorite, Follow, Purchase
+from recipes.versions import get_versions
+
+VIEWER_KEY = 'viewer:{}:{}'
+EMPTY_IDS = {
+    'favorites': frozenset(),
+    'cart': frozenset(),
+    'following': frozenset(),
+}
+
+
+class ViewerContext:
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def ids(self):
+        if self.user.is_anonymous:
+            return EMPTY_IDS
+
+        version, = get_versions(f'user:{self.user.id}')
+        return cache.get_or_set(VIEWER_KEY.format(self.user.id, version),
+                                self.load_ids,
+                                settings.VIEWER_CONTEXT_TIMEOUT)
+
+    def load_ids(self):
+        return {
+            'favorites': frozenset(Favorite.objects.filter(
+                user=self.user).values_list('recipe_id', flat=True)),
+            'cart': frozenset(Purchase.objects.filter(
+                user=self.user).values_list('recipe_id', flat=True)),
+            'following': frozenset(Follow.objects.filter(
+                user=self.user).values_list('author_id', flat=True)),
+        }
+
+    def is_favorited(self, recipe_id):
+        return recipe_id in self.ids['favorites']
+
+    def is_in_shopping_cart(self, recipe_id):
+        return recipe_id in self.ids['cart']
+
+    def is_subscribed(self, author_id):
+        return author_id in self.ids['following']
+
+
+def get_viewer_context(request):
+    if not hasattr(request, 'viewer'):
+        request.viewer = ViewerContext(request.user)
+
+    return request.viewer
@@ -1,4 +1,6 @@
-from django.http import HttpResponse
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
@@ -8,19 +10,33 @@ from rest_framework.mixins import (
 )
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.validators import ValidationError
 
+from recipes.catalog import get_ingredient_catalog
 from recipes.models import (
     Favorite, Follow, Ingredient, Purchase, Recipe, Tag
 )
 from users.models import User
+from .decorators import cache_anonymous_response
+from .feed import fan_out_recipe, get_feed_queryset
 from .filters import IngredientFilter, RecipeFilter
-from .mixins import CreateDestroyMixin, ListRetrieveMixin
+from .metrics import registry
+from .mixins import (
+    ConditionalGetMixin, CreateDestroyMixin, ListRetrieveMixin,
+    ReadSerializerMixin, VersionedMixin
+)
 from .permissions import IsAuthorOrReadOnly
+from .readers import (
+    FollowReadSerializer, IngredientReadSerializer, RecipeReadSerializer
+)
 from .serializers import (
     FavoritePurchaseSerializer, FollowSerializer, IngredientSerializer,
     RecipeGetSerializer, RecipeSerializer, TagSerializer, UserSerializer
 )
-from .utils import get_ingredients_list_for_shopping
+from .utils import (
+    SHOPPING_LIST_FORMATS, get_ingredients_list_for_shopping,
+    load_subscriptions
+)
 
 
 class UserListCreateViewSet(ListModelMixin,
@@ -45,33 +61,55 @@ class UserListCreateViewSet(ListModelMixin,
         return Response(serializer.data)
 
 
-class TagViewSet(ListRetrieveMixin):
+class TagViewSet(ConditionalGetMixin, ListRetrieveMixin):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AllowAny, )
     pagination_class = None
+    version_names = ('tags',)
+
+    @cache_anonymous_response(settings.RESPONSE_CACHE_TIMEOUT)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
-class IngredientViewSet(ListRetrieveMixin):
-    queryset = Ingredient.objects.all()
+class IngredientViewSet(ConditionalGetMixin, ReadSerializerMixin,
+                        ListRetrieveMixin):
     serializer_class = IngredientSerializer
+    read_serializer_class = IngredientReadSerializer
     permission_classes = (AllowAny, )
     filter_backends = (IngredientFilter,)
     pagination_class = None
-    search_fields = ('^name',)
+    version_names = ('ingredients',)
 
+    def get_queryset(self):
+        if self.action == 'list':
+            return get_ingredient_catalog()
 
-class FollowViewSet(viewsets.ModelViewSet):
+        return Ingredient.objects.all()
+
+    @cache_anonymous_response(settings.RESPONSE_CACHE_TIMEOUT)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class FollowViewSet(VersionedMixin, ReadSerializerMixin,
+                    viewsets.ModelViewSet):
     queryset = Follow.objects.all()
     serializer_class = FollowSerializer
+    read_serializer_class = FollowReadSerializer
     permission_classes = (IsAuthenticated, )
+    keyset_ordering = ('id',)
+    user_versioned = True
 
     def list(self, request, *args, **kwargs):
         pages = self.paginate_queryset(
-            Follow.objects.filter(user=request.user)
+            Follow.objects.filter(user=request.user).select_related(
+                'author').order_by('id')
         )
-        serializer = FollowSerializer(pages, many=True,
-                                      context={'request': request})
+        limit = request.query_params.get('recipes_limit')
+        load_subscriptions(pages, int(limit) if limit else None)
+        serializer = self.get_serializer(pages, many=True)
 
         return self.get_paginated_response(serializer.data)
 
@@ -101,15 +139,80 @@ class FollowViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
-    queryset = Recipe.objects.all()
+class RecipeViewSet(ConditionalGetMixin, ReadSerializerMixin,
+                    viewsets.ModelViewSet):
     serializer_class = RecipeSerializer
+    read_serializer_class = RecipeReadSerializer
+    read_actions = ('list', 'feed',)
     filter_class = RecipeFilter
     filter_backends = (DjangoFilterBackend, )
     permission_classes = (IsAuthorOrReadOnly, )
+    version_names = ('recipes', 'tags', 'ingredients',)
+    user_versioned = True
+    ordering_param = 'ordering'
+    search_param = 'search'
+    orderings = {
+        'popular': ('-favorites_count', '-pub_date', '-id'),
+    }
+
+    @property
+    def keyset_only(self):
+        return self.action == 'feed'
+
+    @property
+    def keyset_ordering(self):
+        if (not self.keyset_only
+                and self.request.query_params.get(self.search_param)):
+            return None
+
+        return self.orderings.get(
+            self.request.query_params.get(self.ordering_param),
+            ('-pub_date', '-id'))
+
+    def get_queryset(self):
+        if self.action == 'list':
+            queryset = Recipe.objects.all()
+        else:
+            queryset = Recipe.objects.with_related()
+        ordering = self.request.query_params.get(self.ordering_param)
+        if ordering in self.orderings:
+            return queryset.order_by(*self.orderings[ordering])
+
+        return queryset
+
+    def get_version_names(self):
+        version_names = super().get_version_names()
+        if self.request.query_params.get(self.ordering_param) == 'popular':
+            return (*version_names, 'popularity')
+
+        return version_names
+
+    def get_versions(self, request, *args, **kwargs):
+        versions = super().get_versions(request, *args, **kwargs)
+        try:
+            pk = int(kwargs['pk'])
+        except (KeyError, TypeError, ValueError):
+            return versions
+
+        updated_at = Recipe.objects.filter(pk=pk).values_list(
+            'updated_at', flat=True).first()
+        return [*versions, updated_at.timestamp() if updated_at else 0]
+
+    @cache_anonymous_response(settings.RESPONSE_CACHE_TIMEOUT)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'],
+            permission_classes=(IsAuthenticated,))
+    def feed(self, request):
+        page = self.paginate_queryset(get_feed_queryset(request))
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        recipe = serializer.save(author=self.request.user)
+        fan_out_recipe.delay(recipe.id, recipe.author_id)
 
 
 class FavoritePurchaseViewSet(CreateDestroyMixin):
@@ -147,12 +250,30 @@ class PurchaseViewSet(FavoritePurchaseViewSet):
     serializer_class = RecipeGetSerializer
     model = Purchase
 
+    @transaction.atomic
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     @action(detail=True, methods=['GET'])
     def purchase_list(self, request):
-        response = HttpResponse(
-            get_ingredients_list_for_shopping(request.user),
-            'Content-Type: text/plain')
-        response['Content-Disposition'] = ('attachment; '
-                                           'filename="PurchaseList.txt"')
+        file_type = request.query_params.get('type', 'txt')
+        if file_type not in SHOPPING_LIST_FORMATS:
+            raise ValidationError({'errors': 'Неподдерживаемый формат файла'})
+
+        content_type, render = SHOPPING_LIST_FORMATS[file_type]
+        response = StreamingHttpResponse(
+            render(get_ingredients_list_for_shopping(request.user)),
+            content_type=content_type)
+        response['Content-Disposition'] = (f'attachment; '
+                                           f'filename="PurchaseList.'
+                                           f'{file_type}"')
 
         return response
+
+
+def metrics(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+
+    return HttpResponse(registry.render(),
+                        content_type='text/plain; version=0.0.4')
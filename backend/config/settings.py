@@ -69,6 +69,15 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+        'KEY_PREFIX': 'foodgram',
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation'
@@ -107,7 +116,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageLimitPagination',
     'PAGE_SIZE': 5
@@ -146,3 +155,53 @@ ADMIN_REORDER = (
 DJOSER = {
     'LOGIN_FIELD': 'email',
 }
+
+SHOPPING_CART_CACHE_TIMEOUT = 60 * 10
+
+INGREDIENT_SEARCH_LIMIT = 50
+
+RECIPE_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+RECIPE_IMAGE_MAX_DIMENSION = 6000
+RECIPE_IMAGE_RENDITIONS = {
+    'small': 480,
+    'medium': 1200,
+}
+
+PAGINATION_COUNT_TIMEOUT = 60
+PAGINATION_ESTIMATE_THRESHOLD = 100000
+
+TAG_CHOICES_TIMEOUT = 60 * 60
+
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+AUTH_TOKEN_CACHE_TIMEOUT = 60 * 5
+
+VIEWER_CONTEXT_TIMEOUT = 60 * 10
+
+METRICS_ENABLED = (os.getenv('METRICS_ENABLED', 'False') == 'True')
+SLOW_REQUEST_THRESHOLD = float(os.getenv('SLOW_REQUEST_THRESHOLD', 1))
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, 'api.middleware.MetricsMiddleware')
+
+RECIPE_FRAGMENT_TIMEOUT = 60 * 60
+
+if os.getenv('ORJSON_RENDERER', 'False') == 'True':
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+
+FEED_SIZE = 500
+FEED_TIMEOUT = 60 * 60 * 24
+FEED_FANOUT_LIMIT = 1000
+
+TASK_BACKEND = os.getenv('TASK_BACKEND', (
+    'api.tasks.ImmediateBackend'
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3'
+    else 'api.tasks.ThreadPoolBackend'
+))
+TASK_WORKERS = int(os.getenv('TASK_WORKERS', 2))
+TASK_MAX_RETRIES = 3
+TASK_RETRY_DELAY = 5
+TASK_QUEUE = 'foodgram:tasks'
+TASK_BROKER_CACHE = 'default'
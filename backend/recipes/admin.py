@@ -5,6 +5,9 @@ from users.models import User
 from .models import (
     Favorite, Follow, Ingredient, IngredientAmount, Purchase, Recipe, Tag
 )
+from .purchases import (
+    get_amounts_delta, get_recipe_amounts, update_recipe_purchase_ingredients
+)
 
 
 class IngredientsInline(admin.TabularInline):
@@ -17,11 +20,32 @@ class RecipeAdmin(admin.ModelAdmin):
     list_display = ('name', 'author', 'amount_favorites',)
     inlines = (IngredientsInline,)
     list_filter = ('author', 'name', 'tags',)
+    readonly_fields = ('favorites_count', 'cart_count',)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            super().save_model(request, obj, form, change)
+            return
+
+        obj.save(update_fields=[
+            field.name for field in obj._meta.concrete_fields
+            if not field.primary_key and field.name not in self.readonly_fields
+        ])
+
+    def save_related(self, request, form, formsets, change):
+        old_amounts = get_recipe_amounts(form.instance.id)
+        super().save_related(request, form, formsets, change)
+        update_recipe_purchase_ingredients(
+            form.instance.id,
+            get_amounts_delta(old_amounts,
+                              get_recipe_amounts(form.instance.id))
+        )
 
     def amount_favorites(self, obj):
-        return obj.recipe.count()
+        return obj.favorites_count
 
     amount_favorites.short_description = 'Добавлено в избранное'
+    amount_favorites.admin_order_field = 'favorites_count'
 
 
 @admin.register(User)
@@ -0,0 +1,83 @@
+import bisect
+from array import array
+
+from django.utils.functional import cached_property
+
+from .models import Ingredient
+from .versions import get_versions
+
+_local = {}
+
+
+class IngredientCatalog:
+
+    def __init__(self, rows):
+        ids, names, units = [], [], []
+        for pk, name, measurement_unit in rows:
+            ids.append(pk)
+            names.append(name)
+            units.append(measurement_unit)
+        self.ids = array('l', ids)
+        self.names = tuple(names)
+        self.units = tuple(units)
+        self.positions = {pk: position for position, pk in enumerate(ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return map(self.build, range(len(self.ids)))
+
+    def __contains__(self, pk):
+        return self.position(pk) is not None
+
+    def build(self, position):
+        return Ingredient(id=self.ids[position], name=self.names[position],
+                          measurement_unit=self.units[position])
+
+    def position(self, pk):
+        try:
+            return self.positions.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, pk):
+        position = self.position(pk)
+        return None if position is None else self.build(position)
+
+    @cached_property
+    def search_index(self):
+        return sorted((name.casefold(), position)
+                      for position, name in enumerate(self.names))
+
+    @cached_property
+    def search_keys(self):
+        return [name for name, position in self.search_index]
+
+    def search(self, query, limit):
+        query = query.casefold()
+        start = bisect.bisect_left(self.search_keys, query)
+        prefix = []
+        for name, position in self.search_index[start:]:
+            if not name.startswith(query) or len(prefix) >= limit:
+                break
+            prefix.append(position)
+
+        if len(prefix) < limit:
+            prefix.extend(
+                [position for name, position in self.search_index
+                 if query in name and not name.startswith(query)]
+                [:limit - len(prefix)]
+            )
+        return [self.build(position) for position in prefix]
+
+
+def get_ingredient_catalog():
+    version, = get_versions('ingredients')
+    if _local.get('version') != version:
+        _local['catalog'] = IngredientCatalog(
+            Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit').iterator()
+        )
+        _local['version'] = version
+    return _local['catalog']
@@ -0,0 +1,55 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+RENDITION_FORMAT = 'WEBP'
+RENDITION_EXTENSION = 'webp'
+
+
+def get_rendition_name(name, rendition):
+    directory, filename = os.path.split(os.path.splitext(name)[0])
+    return os.path.join(directory, 'renditions',
+                        f'{filename}_{rendition}.{RENDITION_EXTENSION}')
+
+
+def get_rendition_names(name):
+    return {
+        rendition: get_rendition_name(name, rendition)
+        for rendition in settings.RECIPE_IMAGE_RENDITIONS
+    }
+
+
+def render(image, size):
+    image = image.copy()
+    image.thumbnail((size, size), Image.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, RENDITION_FORMAT, quality=80, method=4)
+    return buffer.getvalue()
+
+
+def generate_renditions(name, storage=default_storage):
+    with storage.open(name) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image = image.convert('RGBA' if 'A' in image.getbands()
+                              or 'transparency' in image.info else 'RGB')
+
+    for rendition, path in get_rendition_names(name).items():
+        content = render(image, settings.RECIPE_IMAGE_RENDITIONS[rendition])
+        if storage.exists(path):
+            storage.delete(path)
+        storage.save(path, ContentFile(content))
+
+
+def get_rendition_urls(image):
+    if not image:
+        return {}
+
+    return {
+        rendition: image.storage.url(path)
+        for rendition, path in get_rendition_names(image.name).items()
+        if image.storage.exists(path)
+    }
@@ -0,0 +1,128 @@
+import csv
+import json
+import os
+import time
+
+from django.db import transaction
+
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+def read_csv(file):
+    reader = csv.reader(file, delimiter=',')
+    header = next(reader)
+    for row in reader:
+        yield dict(zip(header, row))
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = file.read(JSON_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError('JSON file must contain an array of objects')
+    buffer = buffer[1:]
+
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = file.read(JSON_CHUNK_SIZE)
+            if not chunk:
+                raise
+            buffer += chunk
+            continue
+        yield obj
+        buffer = buffer[end:]
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+def get_reader(path, file_format=None):
+    file_format = file_format or os.path.splitext(path)[1].lstrip('.')
+    if file_format not in READERS:
+        raise ValueError(f'Unsupported file format: {file_format}')
+    return READERS[file_format]
+
+
+def batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class BulkImporter:
+
+    def __init__(self, model, unique_fields=(), batch_size=1000):
+        self.model = model
+        self.unique_fields = tuple(unique_fields)
+        self.batch_size = batch_size
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.elapsed = 0
+
+    @property
+    def total(self):
+        return self.created + self.updated + self.skipped
+
+    @property
+    def rows_per_second(self):
+        return self.total / self.elapsed if self.elapsed else 0
+
+    def get_key(self, obj):
+        return tuple(getattr(obj, field) for field in self.unique_fields)
+
+    def get_existing(self, objs):
+        first, *rest = self.unique_fields
+        existing = self.model.objects.filter(**{
+            f'{first}__in': {getattr(obj, first) for obj in objs}
+        })
+        return {self.get_key(obj): obj for obj in existing}
+
+    def import_batch(self, rows):
+        objs = {}
+        for row in rows:
+            obj = self.model(**row)
+            objs[self.get_key(obj) if self.unique_fields else id(obj)] = obj
+        if not self.unique_fields:
+            self.model.objects.bulk_create(objs.values())
+            self.created += len(objs)
+            return
+
+        existing = self.get_existing(objs.values())
+        update_fields = [field for field in rows[0]
+                         if field not in self.unique_fields]
+        to_update = []
+        for key in existing.keys() & objs.keys():
+            obj, new_obj = existing[key], objs.pop(key)
+            for field in update_fields:
+                setattr(obj, field, getattr(new_obj, field))
+            to_update.append(obj)
+
+        self.model.objects.bulk_create(objs.values())
+        self.created += len(objs)
+        if update_fields:
+            self.model.objects.bulk_update(to_update, update_fields)
+            self.updated += len(to_update)
+        else:
+            self.skipped += len(to_update)
+
+    def run(self, rows):
+        started = time.monotonic()
+        with transaction.atomic():
+            for batch in batched(rows, self.batch_size):
+                self.import_batch(batch)
+        self.elapsed = time.monotonic() - started
+        return self
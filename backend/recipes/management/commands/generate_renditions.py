@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import generate_renditions
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = ('Command generates resized WebP renditions of recipe images. '
+            'Example running this command: '
+            '"python manage.py generate_renditions"'
+            )
+
+    def handle(self, *args, **options):
+        names = Recipe.objects.exclude(image='').values_list(
+            'image', flat=True).distinct()
+        for name in names.iterator():
+            try:
+                generate_renditions(name)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'{name}: {error}')
+                continue
+            self.stdout.write(name)
@@ -0,0 +1,52 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.importers import BulkImporter, get_reader
+from recipes.models import Ingredient
+from recipes.versions import bump_versions
+
+
+class Command(BaseCommand):
+    help = ('Command is writing data from csv or json to chosen model in '
+            'batches inside a single transaction. '
+            'Example running this command: '
+            '"python manage.py import_data --path /static/data/'
+            'ingredients.csv --model Ingredient --app recipes '
+            '--unique-fields name measurement_unit"'
+            )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', type=str,
+                            help='path from BASE_DIR', required=True)
+        parser.add_argument('--model', type=str,
+                            help='Model name', required=True)
+        parser.add_argument('--app', type=str,
+                            help='App name', required=True)
+        parser.add_argument('--format', type=str, choices=('csv', 'json'),
+                            help='File format, by default the extension')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per bulk_create')
+        parser.add_argument('--unique-fields', nargs='+', default=(),
+                            help='Natural key used to update existing rows')
+
+    def handle(self, *args, **options):
+        file_path = settings.BASE_DIR + options['path']
+        _model = apps.get_model(options['app'], options['model'])
+        try:
+            reader = get_reader(file_path, options['format'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        importer = BulkImporter(_model, options['unique_fields'],
+                                options['batch_size'])
+        with open(file_path, 'r', encoding='utf-8') as file:
+            importer.run(reader(file))
+        if _model is Ingredient:
+            bump_versions('ingredients')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.total} rows ({importer.created} created, '
+            f'{importer.updated} updated, {importer.skipped} skipped) '
+            f'in {importer.elapsed:.2f}s, '
+            f'{importer.rows_per_second:.0f} rows/sec'))
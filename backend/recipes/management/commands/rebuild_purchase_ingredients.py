@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+
+from recipes.models import IngredientAmount, PurchaseIngredient
+
+
+class Command(BaseCommand):
+    help = ('Command rebuilds the per-user shopping cart totals from '
+            'purchases. Example running this command: '
+            '"python manage.py rebuild_purchase_ingredients --verify"'
+            )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='only report mismatched totals')
+
+    def handle(self, *args, **options):
+        expected = {
+            (row['recipe__purchase__user'], row['ingredient']): row['total']
+            for row in IngredientAmount.objects.filter(
+                recipe__purchase__isnull=False).values(
+                'recipe__purchase__user', 'ingredient').order_by().annotate(
+                total=Sum('amount'))
+        }
+        actual = {
+            (user_id, ingredient_id): total
+            for user_id, ingredient_id, total in
+            PurchaseIngredient.objects.values_list(
+                'user_id', 'ingredient_id', 'total')
+        }
+        mismatched = [key for key in expected.keys() | actual.keys()
+                      if expected.get(key) != actual.get(key)]
+
+        if options['verify']:
+            for user_id, ingredient_id in sorted(mismatched):
+                self.stdout.write(
+                    f'user {user_id}, ingredient {ingredient_id}: '
+                    f'expected {expected.get((user_id, ingredient_id))}, '
+                    f'stored {actual.get((user_id, ingredient_id))}')
+            if mismatched:
+                raise CommandError(f'{len(mismatched)} mismatched totals')
+            self.stdout.write(self.style.SUCCESS('Totals are consistent'))
+            return
+
+        with transaction.atomic():
+            PurchaseIngredient.objects.all().delete()
+            PurchaseIngredient.objects.bulk_create(
+                PurchaseIngredient(user_id=user_id,
+                                   ingredient_id=ingredient_id,
+                                   total=total)
+                for (user_id, ingredient_id), total in expected.items()
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(expected)} totals, fixed {len(mismatched)}'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.search import update_search_index
+
+
+class Command(BaseCommand):
+    help = ('Command rebuilds the recipe full-text search index from '
+            'recipe names, texts and ingredient names. Example running '
+            'this command: "python manage.py rebuild_search_index"'
+            )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            update_search_index()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
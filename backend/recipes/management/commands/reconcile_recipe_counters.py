@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = ('Command recounts favorites and shopping cart counters of '
+            'recipes and fixes the ones that drifted. Meant to be run '
+            'nightly. Example running this command: '
+            '"python manage.py reconcile_recipe_counters"'
+            )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            list(Recipe.objects.select_for_update().order_by(
+                'id').values_list('id', flat=True))
+            mismatched = list(Recipe.objects.annotate(
+                actual_favorites=Count('recipe', distinct=True),
+                actual_cart=Count('purchase', distinct=True),
+            ).exclude(
+                favorites_count=F('actual_favorites'),
+                cart_count=F('actual_cart'),
+            ).only('id', 'favorites_count', 'cart_count'))
+
+            for recipe in mismatched:
+                self.stdout.write(
+                    f'{recipe.id}: favorites {recipe.favorites_count} -> '
+                    f'{recipe.actual_favorites}, cart {recipe.cart_count} '
+                    f'-> {recipe.actual_cart}')
+                recipe.favorites_count = recipe.actual_favorites
+                recipe.cart_count = recipe.actual_cart
+            Recipe.objects.bulk_update(
+                mismatched, ['favorites_count', 'cart_count'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Fixed {len(mismatched)} recipes'))
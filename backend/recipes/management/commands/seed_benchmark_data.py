@@ -0,0 +1,154 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.importers import BulkImporter, read_json
+from recipes.models import (
+    Favorite, Follow, Ingredient, IngredientAmount, Purchase, Recipe, Tag
+)
+from recipes.purchases import bump_shopping_cart_version
+from recipes.versions import bump_versions
+from users.models import User
+
+USERNAME_PREFIX = 'bench_'
+PASSWORD = 'benchmark'
+TAGS = (
+    ('Завтрак', '#17FF13', 'bench-breakfast'),
+    ('Обед', '#FFAE3A', 'bench-dinner'),
+    ('Ужин', '#E53209', 'bench-evening-meal'),
+)
+
+
+class Command(BaseCommand):
+    help = ('Command seeds synthetic users, recipes, favorites, carts and '
+            'follows for benchmarking. Ingredients are imported from json '
+            'when the table is empty. Example running this command: '
+            '"python manage.py seed_benchmark_data --users 100 '
+            '--recipes 2000 --clean"'
+            )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--favorites', type=int, default=10,
+                            help='Favorites per user')
+        parser.add_argument('--carts', type=int, default=5,
+                            help='Shopping cart recipes per user')
+        parser.add_argument('--follows', type=int, default=10,
+                            help='Followed authors per user')
+        parser.add_argument('--path', type=str,
+                            default='/../data/ingredients.json',
+                            help='Ingredients json path from BASE_DIR')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--clean', action='store_true',
+                            help='remove previously seeded data first')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            if options['clean']:
+                self.clean()
+            self.seed_ingredients(settings.BASE_DIR + options['path'])
+            tags = self.seed_tags()
+            users = self.seed_users(options['users'])
+            recipes = self.seed_recipes(rng, users, tags, options)
+            self.seed_relations(rng, users, recipes, options)
+
+        call_command('reconcile_recipe_counters', stdout=self.stdout)
+        call_command('rebuild_purchase_ingredients', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        bump_versions('recipes', 'tags', 'popularity',
+                      *(f'user:{user.id}' for user in users))
+        bump_shopping_cart_version(*(user.id for user in users))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} users and {len(recipes)} recipes'))
+
+    def clean(self):
+        seeded = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        Recipe.objects.filter(author__in=seeded).delete()
+        seeded.delete()
+
+    def seed_ingredients(self, path):
+        if Ingredient.objects.exists():
+            return
+
+        with open(path, 'r', encoding='utf-8') as file:
+            BulkImporter(Ingredient).run(read_json(file))
+        bump_versions('ingredients')
+
+    def seed_tags(self):
+        for name, color, slug in TAGS:
+            Tag.objects.get_or_create(
+                slug=slug, defaults={'name': name, 'color': color})
+
+        return list(Tag.objects.values_list('id', flat=True))
+
+    def seed_users(self, count):
+        offset = User.objects.filter(
+            username__startswith=USERNAME_PREFIX).count()
+        password = make_password(PASSWORD)
+        User.objects.bulk_create([
+            User(username=f'{USERNAME_PREFIX}{number}',
+                 email=f'{USERNAME_PREFIX}{number}@example.com',
+                 first_name='Bench', last_name=str(number), password=password)
+            for number in range(offset, offset + count)
+        ])
+
+        return list(User.objects.filter(
+            username__startswith=USERNAME_PREFIX).order_by('id'))
+
+    def seed_recipes(self, rng, users, tags, options):
+        start = Recipe.objects.order_by('-id').values_list(
+            'id', flat=True).first() or 0
+        Recipe.objects.bulk_create([
+            Recipe(author=rng.choice(users), name=f'Рецепт {start + number}',
+                   text='Текст рецепта для нагрузочного тестирования.',
+                   cooking_time=rng.randint(5, 180))
+            for number in range(options['recipes'])
+        ])
+        recipes = list(Recipe.objects.filter(id__gt=start).values_list(
+            'id', flat=True))
+
+        ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+        per_recipe = min(options['ingredients_per_recipe'],
+                         len(ingredient_ids))
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipes
+            for tag_id in rng.sample(tags, rng.randint(1, len(tags)))
+        ])
+        IngredientAmount.objects.bulk_create([
+            IngredientAmount(recipe_id=recipe_id, ingredient_id=ingredient_id,
+                             amount=rng.randint(1, 500))
+            for recipe_id in recipes
+            for ingredient_id in rng.sample(ingredient_ids, per_recipe)
+        ])
+
+        return recipes
+
+    def seed_relations(self, rng, users, recipes, options):
+        def sample(population, count):
+            return rng.sample(population, min(count, len(population)))
+
+        Favorite.objects.bulk_create([
+            Favorite(user=user, recipe_id=recipe_id)
+            for user in users
+            for recipe_id in sample(recipes, options['favorites'])
+        ], ignore_conflicts=True)
+        Purchase.objects.bulk_create([
+            Purchase(user=user, recipe_id=recipe_id)
+            for user in users
+            for recipe_id in sample(recipes, options['carts'])
+        ], ignore_conflicts=True)
+        Follow.objects.bulk_create([
+            Follow(user=user, author=author)
+            for user in users
+            for author in sample(users, options['follows'])
+            if author != user
+        ], ignore_conflicts=True)
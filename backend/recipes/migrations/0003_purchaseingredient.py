@@ -0,0 +1,50 @@
+# Generated by Django 2.2.19 on 2026-10-18 17:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_purchase_ingredients(apps, schema_editor):
+    IngredientAmount = apps.get_model('recipes', 'IngredientAmount')
+    PurchaseIngredient = apps.get_model('recipes', 'PurchaseIngredient')
+    totals = IngredientAmount.objects.filter(
+        recipe__purchase__isnull=False).values(
+        'recipe__purchase__user', 'ingredient').order_by().annotate(
+        total=models.Sum('amount'))
+    PurchaseIngredient.objects.bulk_create(
+        PurchaseIngredient(user_id=row['recipe__purchase__user'],
+                           ingredient_id=row['ingredient'],
+                           total=row['total'])
+        for row in totals
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0002_auto_20220828_1336'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseIngredient',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0, verbose_name='Количество')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.Ingredient', verbose_name='Ингредиент')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchase_ingredients', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Ингредиент в списке покупок',
+                'verbose_name_plural': 'Ингредиенты в списке покупок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='purchaseingredient',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='unique_purchase_ingredients_user'),
+        ),
+        migrations.RunPython(fill_purchase_ingredients,
+                             migrations.RunPython.noop),
+    ]
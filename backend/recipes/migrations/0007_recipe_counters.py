@@ -0,0 +1,47 @@
+# Generated by Django 2.2.19 on 2026-10-18 17:53
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model):
+    return Coalesce(models.Subquery(
+        model.objects.filter(recipe=models.OuterRef('pk')).order_by().values(
+            'recipe').annotate(count=models.Count('id')).values('count'),
+        output_field=models.IntegerField()
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Favorite = apps.get_model('recipes', 'Favorite')
+    Purchase = apps.get_model('recipes', 'Purchase')
+    Recipe.objects.update(
+        favorites_count=count_subquery(Favorite),
+        cart_count=count_subquery(Purchase),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_recipe_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='cart_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Добавлено в список покупок'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Добавлено в избранное'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favorites_count', '-pub_date', '-id'], name='recipes_rec_favorit_3c951d_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+from recipes.search import FTS_TABLE, update_search_index
+
+CREATE_INDEX = {
+    'postgresql': [
+        'ALTER TABLE recipes_recipe '
+        'ADD COLUMN IF NOT EXISTS search_vector tsvector',
+        'CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector_idx '
+        'ON recipes_recipe USING gin (search_vector)',
+    ],
+    'sqlite': [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+        'USING fts5(name, ingredients, text)',
+    ],
+}
+
+DROP_INDEX = {
+    'postgresql': [
+        'DROP INDEX IF EXISTS recipes_recipe_search_vector_idx',
+        'ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector',
+    ],
+    'sqlite': [
+        f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    ],
+}
+
+
+def create_search_index(apps, schema_editor):
+    for statement in CREATE_INDEX.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+    update_search_index()
+
+
+def drop_search_index(apps, schema_editor):
+    for statement in DROP_INDEX.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -2,6 +2,9 @@ from colorfield.fields import ColorField
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import Exists, OuterRef, Prefetch, Q
+
+from .search import search_recipes
 
 User = get_user_model()
 
@@ -32,6 +35,33 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+
+    @staticmethod
+    def related_lookups():
+        return (
+            'tags',
+            Prefetch(
+                'ingredientamount_set',
+                queryset=IngredientAmount.objects.select_related('ingredient')
+            ),
+        )
+
+    def with_related(self):
+        return self.select_related('author').prefetch_related(
+            *self.related_lookups())
+
+    def search(self, query):
+        return search_recipes(self, query)
+
+    def search_icontains(self, query):
+        return self.annotate(has_ingredient=Exists(
+            IngredientAmount.objects.filter(
+                recipe=OuterRef('pk'), ingredient__name__icontains=query)
+        )).filter(Q(name__icontains=query) | Q(text__icontains=query)
+                  | Q(has_ingredient=True))
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -58,11 +88,20 @@ class Recipe(models.Model):
         validators=[MinValueValidator(1)],
         verbose_name='Время приготовления, мин')
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    favorites_count = models.PositiveIntegerField(
+        default=0, verbose_name='Добавлено в избранное')
+    cart_count = models.PositiveIntegerField(
+        default=0, verbose_name='Добавлено в список покупок')
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
         indexes = [
             models.Index(fields=['name']),
+            models.Index(fields=['-pub_date', '-id']),
+            models.Index(fields=['-favorites_count', '-pub_date', '-id']),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -160,6 +199,34 @@ class Purchase(models.Model):
         return f'{self.user.first_name} -> {self.recipe.name}'
 
 
+class PurchaseIngredient(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='purchase_ingredients',
+        verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        verbose_name='Ингредиент'
+    )
+    total = models.IntegerField(default=0, verbose_name='Количество')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_purchase_ingredients_user',
+            ),
+        ]
+        verbose_name = 'Ингредиент в списке покупок'
+        verbose_name_plural = 'Ингредиенты в списке покупок'
+
+    def __str__(self):
+        return f'{self.user.first_name} -> {self.ingredient.name}'
+
+
 class Follow(models.Model):
     user = models.ForeignKey(
         User,
@@ -0,0 +1,73 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import IngredientAmount, Purchase, PurchaseIngredient
+
+SHOPPING_CART_VERSION_KEY = 'shopping_cart_version:{}'
+
+
+def get_shopping_cart_version(user_id):
+    return cache.get_or_set(SHOPPING_CART_VERSION_KEY.format(user_id),
+                            lambda: uuid.uuid4().hex, None)
+
+
+def bump_shopping_cart_version(*user_ids):
+    cache.set_many({
+        SHOPPING_CART_VERSION_KEY.format(user_id): uuid.uuid4().hex
+        for user_id in user_ids
+    }, None)
+
+
+def get_recipe_amounts(recipe_id, sign=1):
+    return {
+        ingredient_id: sign * amount
+        for ingredient_id, amount in IngredientAmount.objects.filter(
+            recipe=recipe_id).values_list('ingredient_id', 'amount')
+    }
+
+
+def get_amounts_delta(old_amounts, new_amounts):
+    delta = {
+        ingredient_id: amount - old_amounts.get(ingredient_id, 0)
+        for ingredient_id, amount in new_amounts.items()
+    }
+    delta.update({
+        ingredient_id: -amount
+        for ingredient_id, amount in old_amounts.items()
+        if ingredient_id not in new_amounts
+    })
+    return {key: value for key, value in delta.items() if value}
+
+
+def update_purchase_ingredients(user_ids, delta):
+    user_ids = list(user_ids)
+    if not user_ids or not delta:
+        return
+
+    PurchaseIngredient.objects.bulk_create([
+        PurchaseIngredient(user_id=user_id, ingredient_id=ingredient_id)
+        for user_id in user_ids
+        for ingredient_id, amount in delta.items() if amount > 0
+    ], ignore_conflicts=True)
+    rows = PurchaseIngredient.objects.filter(user__in=user_ids,
+                                             ingredient__in=delta)
+    rows.update(total=F('total') + Case(
+        *[When(ingredient_id=ingredient_id, then=Value(amount))
+          for ingredient_id, amount in delta.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+    rows.filter(total__lte=0).delete()
+
+
+def update_recipe_purchase_ingredients(recipe_id, delta):
+    if not delta:
+        return
+
+    user_ids = list(Purchase.objects.filter(recipe=recipe_id).values_list(
+        'user_id', flat=True))
+    update_purchase_ingredients(user_ids, delta)
+    transaction.on_commit(lambda: bump_shopping_cart_version(*user_ids))
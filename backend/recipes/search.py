@@ -0,0 +1,99 @@
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'recipes_recipe_fts'
+
+INGREDIENT_NAMES = (
+    'SELECT {} FROM recipes_ingredientamount amount '
+    'JOIN recipes_ingredient ingredient '
+    'ON ingredient.id = amount.ingredient_id '
+    'WHERE amount.recipe_id = recipes_recipe.id'
+)
+POSTGRES_NAMES = INGREDIENT_NAMES.format("string_agg(ingredient.name, ' ')")
+SQLITE_NAMES = INGREDIENT_NAMES.format("group_concat(ingredient.name, ' ')")
+
+POSTGRES_UPDATE = (
+    'UPDATE recipes_recipe SET search_vector = '
+    "setweight(to_tsvector(%s::regconfig, name), 'A') || "
+    f"setweight(to_tsvector(%s::regconfig, coalesce(({POSTGRES_NAMES}), '')),"
+    " 'B') || "
+    "setweight(to_tsvector(%s::regconfig, text), 'C') {where}"
+)
+POSTGRES_MATCHES = (
+    'recipes_recipe.search_vector @@ plainto_tsquery(%s::regconfig, %s)'
+)
+POSTGRES_RANK = (
+    'ts_rank(recipes_recipe.search_vector, '
+    'plainto_tsquery(%s::regconfig, %s))'
+)
+
+SQLITE_DELETE = f'DELETE FROM {FTS_TABLE} {{where}}'
+SQLITE_INSERT = (
+    f'INSERT INTO {FTS_TABLE} (rowid, name, ingredients, text) '
+    f"SELECT id, name, coalesce(({SQLITE_NAMES}), ''), text "
+    'FROM recipes_recipe {where}'
+)
+SQLITE_MATCHES = (
+    f'recipes_recipe.id IN (SELECT rowid FROM {FTS_TABLE} '
+    f'WHERE {FTS_TABLE} MATCH %s)'
+)
+SQLITE_RANK = (
+    f'(SELECT -bm25({FTS_TABLE}, 10.0, 4.0, 1.0) FROM {FTS_TABLE} '
+    f'WHERE {FTS_TABLE} MATCH %s AND rowid = recipes_recipe.id)'
+)
+
+
+def get_where(column, recipe_ids):
+    if recipe_ids is None:
+        return '', []
+
+    placeholders = ', '.join(['%s'] * len(recipe_ids))
+    return f'WHERE {column} IN ({placeholders})', list(recipe_ids)
+
+
+def update_search_index(recipe_ids=None):
+    if recipe_ids is not None and not recipe_ids:
+        return
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            where, params = get_where('id', recipe_ids)
+            cursor.execute(POSTGRES_UPDATE.format(where=where),
+                           [SEARCH_CONFIG] * 3 + params)
+        elif connection.vendor == 'sqlite':
+            where, params = get_where('rowid', recipe_ids)
+            cursor.execute(SQLITE_DELETE.format(where=where), params)
+            where, params = get_where('id', recipe_ids)
+            cursor.execute(SQLITE_INSERT.format(where=where), params)
+
+
+def remove_from_search_index(recipe_ids):
+    if connection.vendor != 'sqlite' or not recipe_ids:
+        return
+
+    where, params = get_where('rowid', recipe_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(SQLITE_DELETE.format(where=where), params)
+
+
+def get_fts_query(query):
+    return ' '.join('"{}"*'.format(word.replace('"', '""'))
+                    for word in query.split())
+
+
+def search_recipes(queryset, query):
+    if connection.vendor == 'postgresql':
+        matches, rank = POSTGRES_MATCHES, POSTGRES_RANK
+        params = [SEARCH_CONFIG, query]
+    elif connection.vendor == 'sqlite':
+        matches, rank = SQLITE_MATCHES, SQLITE_RANK
+        params = [get_fts_query(query)]
+    else:
+        return queryset.search_icontains(query)
+
+    return queryset.annotate(search_match=RawSQL(
+        matches, params, output_field=BooleanField())).filter(
+        search_match=True).order_by(
+        RawSQL(rank, params).desc(), '-pub_date', '-id')